@@ -1,9 +1,21 @@
+from decimal import Decimal
+from functools import lru_cache
+
 import pytest
 
 from ....account.models import Address
-from ....checkout.fetch import CheckoutInfo
+from ....channel.models import Channel
+from ....checkout.fetch import CheckoutInfo, CheckoutLineInfo
+from ....checkout.models import Checkout, CheckoutLine
+from ....product.models import (
+    Product,
+    ProductType,
+    ProductVariant,
+    ProductVariantChannelListing,
+)
 from ....shipping.models import ShippingMethodChannelListing
 from ...models import PluginConfiguration
+from .. import AvataxConfiguration, generate_request_data_from_checkout
 from ..plugin import AvataxPlugin
 
 
@@ -11,9 +23,30 @@ from ..plugin import AvataxPlugin
 def vcr_config():
     return {
         "filter_headers": [("Authorization", "Basic Og==")],
+        "decode_compressed_response": True,
     }
 
 
+@lru_cache(maxsize=None)
+def _avatax_config(username, password, use_sandbox=True):
+    # Nothing mutates these configs, so equal arguments can share an instance.
+    return AvataxConfiguration(
+        username_or_account=username,
+        password_or_license=password,
+        use_sandbox=use_sandbox,
+        from_street_address="Tęczowa 7",
+        from_city="WROCŁAW",
+        from_country_area="",
+        from_postal_code="53-601",
+        from_country="PL",
+    )
+
+
+@pytest.fixture
+def avatax_config():
+    return _avatax_config
+
+
 @pytest.fixture
 def plugin_configuration(db, channel_USD):
     def set_configuration(
@@ -54,6 +87,18 @@ def plugin_configuration(db, channel_USD):
     return set_configuration
 
 
+def _get_stub_tax_codes(config):
+    return {"PC040156": "desc"}
+
+
+@pytest.fixture
+def stub_tax_codes(monkeypatch):
+    monkeypatch.setattr(
+        "saleor.plugins.avatax.plugin.get_cached_tax_codes_or_fetch",
+        _get_stub_tax_codes,
+    )
+
+
 @pytest.fixture
 def ship_to_pl_address(db):
     return Address.objects.create(
@@ -76,6 +121,67 @@ def checkout_with_items_and_shipping(checkout_with_items, address, shipping_meth
     return checkout_with_items
 
 
+@pytest.fixture
+def unsaved_checkout_info():
+    """Return checkout info of a checkout kept out of the DB."""
+    channel = Channel(name="Main Channel", slug="main", currency_code="USD")
+    checkout = Checkout(channel=channel, currency="USD", email="user@email.com")
+    return CheckoutInfo(
+        checkout=checkout,
+        user=None,
+        channel=channel,
+        billing_address=None,
+        shipping_address=None,
+        shipping_method=None,
+        valid_shipping_methods=[],
+        shipping_method_channel_listings=None,
+    )
+
+
+@pytest.fixture
+def unsaved_checkout_lines(unsaved_checkout_info):
+    """Return a single line info for `unsaved_checkout_info`, kept out of the DB."""
+    channel = unsaved_checkout_info.channel
+    product_type = ProductType(name="Default Type", slug="default-type")
+    product = Product(
+        name="Test product", slug="test-product", product_type=product_type
+    )
+    variant = ProductVariant(product=product, sku="123")
+    channel_listing = ProductVariantChannelListing(
+        variant=variant, channel=channel, price_amount=Decimal(10), currency="USD"
+    )
+    line = CheckoutLine(
+        checkout=unsaved_checkout_info.checkout, variant=variant, quantity=3
+    )
+    return [
+        CheckoutLineInfo(
+            line=line,
+            variant=variant,
+            channel_listing=channel_listing,
+            product=product,
+            product_type=product_type,
+            collections=[],
+        )
+    ]
+
+
+@pytest.fixture
+def avatax_checkout_data(avatax_config, unsaved_checkout_info, unsaved_checkout_lines):
+    checkout_info = unsaved_checkout_info
+    checkout_info.shipping_address = Address(
+        first_name="John",
+        last_name="Doe",
+        street_address_1="Tęczowa 7",
+        city="WROCŁAW",
+        postal_code="53-601",
+        country="PL",
+    )
+    config = avatax_config("wrong_data", "wrong_data")
+    return generate_request_data_from_checkout(
+        checkout_info, unsaved_checkout_lines, config
+    )
+
+
 @pytest.fixture
 def checkout_with_items_and_shipping_info(checkout_with_items_and_shipping):
     checkout = checkout_with_items_and_shipping
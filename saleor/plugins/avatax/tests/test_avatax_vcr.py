@@ -0,0 +1,885 @@
+from decimal import Decimal
+
+import pytest
+from django.test import override_settings
+from prices import Money, TaxedMoney
+
+from ....checkout.fetch import CheckoutInfo, fetch_checkout_info, fetch_checkout_lines
+from ....checkout.utils import add_variant_to_checkout
+from ....core.prices import quantize_price
+from ....core.taxes import TaxError
+from ....product.models import Product, ProductType
+from ...manager import get_plugins_manager
+from .. import get_cached_tax_codes_or_fetch
+from ..plugin import AvataxPlugin
+
+pytestmark = pytest.mark.slow
+
+
+def _taxed_money(net, gross):
+    return TaxedMoney(net=Money(net, "USD"), gross=Money(gross, "USD"))
+
+
+def _assert_taxed_money_almost_equal(total, expected):
+    # compare amounts within half a cent instead of quantizing the result first
+    assert total.currency == expected.currency
+    tolerance = Decimal("0.005")
+    assert total.net.amount == pytest.approx(expected.net.amount, abs=tolerance)
+    assert total.gross.amount == pytest.approx(expected.gross.amount, abs=tolerance)
+
+
+def _taxed_money_id(value):
+    # keep the "<net>-<gross>" ids the recorded cassettes are named after
+    if isinstance(value, TaxedMoney):
+        return f"{value.net.amount}-{value.gross.amount}"
+    return None
+
+
+@pytest.mark.vcr()
+@pytest.mark.parametrize(
+    "with_discount, expected_total, taxes_in_prices",
+    [
+        (True, _taxed_money("12.20", "15.00"), True),
+        (False, _taxed_money("24.39", "30.00"), True),
+        (True, _taxed_money("15.00", "18.45"), False),
+        (False, _taxed_money("30.00", "36.90"), False),
+    ],
+    ids=_taxed_money_id,
+)
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_calculate_checkout_line_total(
+    with_discount,
+    expected_total,
+    taxes_in_prices,
+    discount_info,
+    checkout_with_item,
+    address,
+    ship_to_pl_address,
+    site_settings,
+    monkeypatch,
+    shipping_zone,
+    plugin_configuration,
+):
+    plugin_configuration()
+    manager = get_plugins_manager()
+
+    checkout_with_item.shipping_address = ship_to_pl_address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+    site_settings.company_address = address
+    site_settings.include_taxes_in_prices = taxes_in_prices
+    site_settings.save(update_fields=["company_address", "include_taxes_in_prices"])
+    line = checkout_with_item.lines.select_related("variant__product").first()
+    product = line.variant.product
+    product.metadata = {}
+    product.charge_taxes = True
+    product.save(update_fields=["metadata", "charge_taxes"])
+    discounts = [discount_info] if with_discount else None
+
+    lines = fetch_checkout_lines(checkout_with_item)
+    checkout_info = fetch_checkout_info(checkout_with_item, lines, discounts, manager)
+    checkout_line_info = lines[0]
+
+    total = manager.calculate_checkout_line_total(
+        checkout_info,
+        lines,
+        checkout_line_info,
+        checkout_with_item.shipping_address,
+        discounts,
+    )
+    _assert_taxed_money_almost_equal(total, expected_total)
+
+
+@pytest.mark.vcr()
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_calculate_order_line_total(
+    order_line,
+    address,
+    ship_to_pl_address,
+    shipping_zone,
+    site_settings,
+    monkeypatch,
+    plugin_configuration,
+):
+    plugin_configuration()
+    manager = get_plugins_manager()
+
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+
+    order = order_line.order
+    order.shipping_address = ship_to_pl_address
+    order.shipping_method = shipping_zone.shipping_methods.get()
+    order.save(update_fields=["shipping_address", "shipping_method"])
+
+    variant = order_line.variant
+    product = variant.product
+    product.metadata = {}
+    product.charge_taxes = True
+    product.save(update_fields=["metadata", "charge_taxes"])
+
+    channel = order_line.order.channel
+    channel_listing = variant.channel_listings.get(channel=channel)
+
+    net = variant.get_price(product, [], channel, channel_listing)
+    unit_price = TaxedMoney(net=net, gross=net)
+    order_line.unit_price = unit_price
+    total_price = unit_price * order_line.quantity
+    order_line.total_price = total_price
+    order_line.save()
+
+    total = manager.calculate_order_line_total(
+        order_line.order,
+        order_line,
+        variant,
+        product,
+    )
+    total = quantize_price(total, total.currency)
+    assert total == TaxedMoney(net=Money("30.00", "USD"), gross=Money("36.90", "USD"))
+
+
+@pytest.mark.vcr
+@pytest.mark.parametrize(
+    "with_discount, expected_total, voucher_amount, taxes_in_prices, "
+    "tax_code, patch_skip",
+    [
+        (True, _taxed_money("22.32", "26.99"), "0.0", True, "PC040156", False),
+        (True, _taxed_money("21.99", "27.74"), "5.0", False, "PC040156", False),
+        (False, _taxed_money("41.99", "51.19"), "0.0", False, "PC040156", False),
+        (False, _taxed_money("31.51", "38.99"), "3.0", True, "PC040156", False),
+        (True, _taxed_money("23.94", "28.98"), "0.0", True, "PS081282", True),
+        (True, _taxed_money("23.98", "30.19"), "5.0", False, "PS081282", True),
+        (False, _taxed_money("43.98", "53.64"), "0.0", False, "PS081282", True),
+        (False, _taxed_money("33.13", "40.98"), "3.0", True, "PS081282", True),
+    ],
+    ids=_taxed_money_id,
+)
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_calculate_checkout_total(
+    with_discount,
+    expected_total,
+    voucher_amount,
+    taxes_in_prices,
+    tax_code,
+    patch_skip,
+    checkout_with_item,
+    product_with_single_variant,
+    discount_info,
+    shipping_zone,
+    address,
+    ship_to_pl_address,
+    site_settings,
+    monkeypatch,
+    plugin_configuration,
+    non_default_category,
+):
+    plugin_configuration()
+    monkeypatch.setattr(
+        "saleor.plugins.avatax.plugin.get_cached_tax_codes_or_fetch",
+        lambda _: {tax_code: "desc"},
+    )
+    if patch_skip:
+        monkeypatch.setattr(
+            "saleor.plugins.avatax.plugin.AvataxPlugin._skip_plugin", lambda *_: False
+        )
+    manager = get_plugins_manager()
+    site_settings.company_address = address
+    site_settings.include_taxes_in_prices = taxes_in_prices
+    site_settings.save(update_fields=["company_address", "include_taxes_in_prices"])
+
+    checkout_with_item.shipping_address = ship_to_pl_address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.discount = Money(voucher_amount, "USD")
+    checkout_with_item.save(
+        update_fields=["shipping_address", "shipping_method", "discount_amount"]
+    )
+    line = checkout_with_item.lines.select_related(
+        "variant__product__product_type"
+    ).first()
+    product = line.variant.product
+    product.metadata = {}
+    manager.assign_tax_code_to_object_meta(product.product_type, tax_code)
+    product.save(update_fields=["metadata"])
+    product.product_type.save(update_fields=["metadata"])
+
+    product_with_single_variant.charge_taxes = False
+    product_with_single_variant.category = non_default_category
+    product_with_single_variant.save(update_fields=["charge_taxes", "category"])
+    discounts = [discount_info] if with_discount else None
+    checkout_info = fetch_checkout_info(checkout_with_item, [], discounts, manager)
+    add_variant_to_checkout(checkout_info, product_with_single_variant.variants.get())
+    lines = fetch_checkout_lines(checkout_with_item)
+    total = manager.calculate_checkout_total(
+        checkout_info, lines, ship_to_pl_address, discounts
+    )
+    _assert_taxed_money_almost_equal(total, expected_total)
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_calculate_checkout_total_not_charged_product_and_shipping_with_0_price(
+    checkout_with_item,
+    shipping_zone,
+    address,
+    ship_to_pl_address,
+    site_settings,
+    monkeypatch,
+    plugin_configuration,
+):
+    plugin_configuration()
+    monkeypatch.setattr(
+        "saleor.plugins.avatax.plugin.get_cached_tax_codes_or_fetch",
+        lambda _: {"PS081282": "desc"},
+    )
+    monkeypatch.setattr(
+        "saleor.plugins.avatax.plugin.AvataxPlugin._skip_plugin", lambda *_: False
+    )
+    manager = get_plugins_manager()
+    site_settings.company_address = address
+    site_settings.include_taxes_in_prices = True
+    site_settings.save(update_fields=["company_address", "include_taxes_in_prices"])
+
+    channel = checkout_with_item.channel
+    shipping_method = shipping_zone.shipping_methods.get()
+    shipping_channel_listing = shipping_method.channel_listings.get(channel=channel)
+    shipping_channel_listing.price = Money(0, "USD")
+    shipping_channel_listing.save(update_fields=["price_amount"])
+
+    checkout_with_item.shipping_address = ship_to_pl_address
+    checkout_with_item.shipping_method = shipping_method
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+
+    line = checkout_with_item.lines.select_related("variant__product").first()
+    variant = line.variant
+    product = variant.product
+    product.charge_taxes = False
+    product.metadata = {}
+    manager.assign_tax_code_to_object_meta(product.product_type, "PS081282")
+    product.save(update_fields=["metadata", "charge_taxes"])
+    product.product_type.save(update_fields=["metadata"])
+
+    discounts = None
+    checkout_info = fetch_checkout_info(checkout_with_item, [], discounts, manager)
+    lines = fetch_checkout_lines(checkout_with_item)
+    total = manager.calculate_checkout_total(
+        checkout_info, lines, ship_to_pl_address, discounts
+    )
+    total = quantize_price(total, total.currency)
+
+    channel_listing = variant.channel_listings.get(channel=channel)
+    expected_amount = (line.quantity * channel_listing.price).amount
+    assert total == TaxedMoney(
+        net=Money(expected_amount, "USD"), gross=Money(expected_amount, "USD")
+    )
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_calculate_checkout_shipping(
+    checkout_with_item,
+    shipping_zone,
+    discount_info,
+    address,
+    ship_to_pl_address,
+    site_settings,
+    plugin_configuration,
+    stub_tax_codes,
+):
+    plugin_configuration()
+    manager = get_plugins_manager()
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+
+    checkout_with_item.shipping_address = ship_to_pl_address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+    lines = fetch_checkout_lines(checkout_with_item)
+    checkout_info = fetch_checkout_info(
+        checkout_with_item, lines, [discount_info], manager
+    )
+    shipping_price = manager.calculate_checkout_shipping(
+        checkout_info, lines, address, [discount_info]
+    )
+    shipping_price = quantize_price(shipping_price, shipping_price.currency)
+    assert shipping_price == TaxedMoney(
+        net=Money("8.13", "USD"), gross=Money("10.00", "USD")
+    )
+
+
+@pytest.mark.vcr
+@pytest.mark.parametrize(
+    "with_discount, expected_total, taxes_in_prices",
+    [
+        (True, _taxed_money("25.00", "30.75"), False),
+        (False, _taxed_money("40.65", "50.00"), True),
+        (False, _taxed_money("50.00", "61.50"), False),
+        (True, _taxed_money("20.33", "25.00"), True),
+    ],
+    ids=_taxed_money_id,
+)
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_calculate_checkout_subtotal(
+    with_discount,
+    expected_total,
+    taxes_in_prices,
+    discount_info,
+    checkout_with_item,
+    stock,
+    site_settings,
+    ship_to_pl_address,
+    shipping_zone,
+    address,
+    plugin_configuration,
+    stub_tax_codes,
+):
+    plugin_configuration()
+    variant = stock.product_variant
+    manager = get_plugins_manager()
+    site_settings.company_address = address
+    site_settings.include_taxes_in_prices = taxes_in_prices
+    site_settings.save(update_fields=["company_address", "include_taxes_in_prices"])
+
+    checkout_with_item.shipping_address = ship_to_pl_address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+
+    discounts = [discount_info] if with_discount else None
+
+    checkout_info = fetch_checkout_info(checkout_with_item, [], discounts, manager)
+    add_variant_to_checkout(checkout_info, variant, 2)
+    lines = fetch_checkout_lines(checkout_with_item)
+    total = manager.calculate_checkout_subtotal(
+        checkout_info, lines, address, discounts
+    )
+    _assert_taxed_money_almost_equal(total, expected_total)
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_calculate_order_shipping(
+    order_line, shipping_zone, site_settings, address, plugin_configuration
+):
+    plugin_configuration()
+    manager = get_plugins_manager()
+    order = order_line.order
+    method = shipping_zone.shipping_methods.get()
+    order.shipping_address = order.billing_address.get_copy()
+    order.shipping_method_name = method.name
+    order.shipping_method = method
+    order.save()
+
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+
+    price = manager.calculate_order_shipping(order)
+    price = quantize_price(price, price.currency)
+    assert price == TaxedMoney(net=Money("8.13", "USD"), gross=Money("10.00", "USD"))
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_calculate_order_line_unit(
+    order_line,
+    shipping_zone,
+    site_settings,
+    address_usa,
+    plugin_configuration,
+):
+    plugin_configuration()
+    manager = get_plugins_manager()
+    order_line.unit_price = TaxedMoney(
+        net=Money("10.00", "USD"), gross=Money("10.00", "USD")
+    )
+    order_line.save()
+
+    order = order_line.order
+    method = shipping_zone.shipping_methods.get()
+    order.shipping_address = order.billing_address.get_copy()
+    order.shipping_method_name = method.name
+    order.shipping_method = method
+    order.save()
+
+    site_settings.company_address = address_usa
+    site_settings.save(update_fields=["company_address"])
+
+    line_price = manager.calculate_order_line_unit(
+        order, order_line, order_line.variant, order_line.variant.product
+    )
+    line_price = quantize_price(line_price, line_price.currency)
+
+    assert line_price == TaxedMoney(
+        net=Money("8.13", "USD"), gross=Money("10.00", "USD")
+    )
+
+
+@pytest.mark.vcr
+@pytest.mark.parametrize("charge_taxes", [True, False])
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_calculate_checkout_line_unit_price(
+    charge_taxes,
+    checkout_with_item,
+    shipping_zone,
+    site_settings,
+    address_usa,
+    address,
+    plugin_configuration,
+):
+    plugin_configuration()
+    checkout = checkout_with_item
+    total_price = TaxedMoney(
+        net=Money("10.00", "USD") * 3, gross=Money("10.00", "USD") * 3
+    )
+
+    lines = fetch_checkout_lines(checkout_with_item)
+    checkout_line = lines[0]
+    product = checkout_line.variant.product
+    product.charge_taxes = charge_taxes
+    product.save(update_fields=["charge_taxes"])
+
+    manager = get_plugins_manager()
+
+    checkout.shipping_address = address
+    checkout.shipping_method = shipping_zone.shipping_methods.get()
+    checkout.save(update_fields=["shipping_address", "shipping_method"])
+
+    site_settings.company_address = address_usa
+    site_settings.include_taxes_in_prices = True
+    site_settings.save(update_fields=["company_address", "include_taxes_in_prices"])
+
+    checkout_info = fetch_checkout_info(checkout_with_item, lines, [], manager)
+    line_price = manager.calculate_checkout_line_unit_price(
+        total_price,
+        checkout_line.line.quantity,
+        checkout_info,
+        lines,
+        checkout_line,
+        checkout.shipping_address,
+        [],
+    )
+    line_price = quantize_price(line_price, line_price.currency)
+
+    if charge_taxes:
+        assert line_price == TaxedMoney(
+            net=Money("8.13", "USD"), gross=Money("10.00", "USD")
+        )
+    else:
+        assert line_price == TaxedMoney(
+            net=Money("10.00", "USD"), gross=Money("10.00", "USD")
+        )
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_preprocess_order_creation(
+    checkout_with_item,
+    address,
+    ship_to_pl_address,
+    site_settings,
+    shipping_zone,
+    discount_info,
+    plugin_configuration,
+    stub_tax_codes,
+):
+
+    plugin_configuration()
+    manager = get_plugins_manager()
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+
+    checkout_with_item.shipping_address = ship_to_pl_address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+    discounts = [discount_info]
+    lines = fetch_checkout_lines(checkout_with_item)
+    checkout_info = fetch_checkout_info(checkout_with_item, lines, discounts, manager)
+    manager.preprocess_order_creation(checkout_info, discounts, lines)
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_preprocess_order_creation_no_lines_data(
+    checkout_with_item,
+    address,
+    ship_to_pl_address,
+    site_settings,
+    shipping_zone,
+    discount_info,
+    plugin_configuration,
+    stub_tax_codes,
+):
+
+    plugin_configuration()
+    manager = get_plugins_manager()
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+
+    checkout_with_item.shipping_address = ship_to_pl_address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+    discounts = [discount_info]
+    lines = fetch_checkout_lines(checkout_with_item)
+    checkout_info = fetch_checkout_info(checkout_with_item, lines, discounts, manager)
+    manager.preprocess_order_creation(checkout_info, discounts)
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_preprocess_order_creation_wrong_data(
+    checkout_with_item,
+    address,
+    shipping_zone,
+    discount_info,
+    plugin_configuration,
+    stub_tax_codes,
+):
+    plugin_configuration("wrong", "wrong")
+
+    manager = get_plugins_manager()
+
+    checkout_with_item.shipping_address = address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+    discounts = [discount_info]
+    lines = fetch_checkout_lines(checkout_with_item)
+    checkout_info = fetch_checkout_info(checkout_with_item, lines, discounts, manager)
+    with pytest.raises(TaxError):
+        manager.preprocess_order_creation(checkout_info, discounts, lines)
+
+
+@pytest.mark.vcr
+def test_get_cached_tax_codes_or_fetch(monkeypatch, avatax_config):
+    monkeypatch.setattr("saleor.plugins.avatax.cache.get", lambda x, y: {})
+    config = avatax_config("test", "test", use_sandbox=False)
+    tax_codes = get_cached_tax_codes_or_fetch(config)
+    assert len(tax_codes) > 0
+
+
+@pytest.mark.vcr
+def test_get_cached_tax_codes_or_fetch_wrong_response(monkeypatch, avatax_config):
+    monkeypatch.setattr("saleor.plugins.avatax.cache.get", lambda x, y: {})
+    config = avatax_config("wrong_data", "wrong_data")
+    tax_codes = get_cached_tax_codes_or_fetch(config)
+    assert len(tax_codes) == 0
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_get_checkout_line_tax_rate(
+    checkout_with_item,
+    address,
+    plugin_configuration,
+    shipping_zone,
+    site_settings,
+    stub_tax_codes,
+):
+    # given
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+    plugin_configuration()
+    unit_price = TaxedMoney(Money(12, "USD"), Money(14, "USD"))
+
+    manager = get_plugins_manager()
+
+    checkout_with_item.shipping_address = address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+
+    checkout_info = CheckoutInfo(
+        checkout=checkout_with_item,
+        shipping_method=checkout_with_item.shipping_method,
+        shipping_address=address,
+        billing_address=None,
+        channel=checkout_with_item.channel,
+        user=None,
+        shipping_method_channel_listings=None,
+        valid_shipping_methods=[],
+    )
+    lines = fetch_checkout_lines(checkout_with_item)
+    checkout_line_info = lines[0]
+
+    # when
+    tax_rate = manager.get_checkout_line_tax_rate(
+        checkout_info,
+        lines,
+        checkout_line_info,
+        checkout_with_item.shipping_address,
+        [],
+        unit_price,
+    )
+
+    # then
+    assert tax_rate == Decimal("0.23")
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_get_checkout_line_tax_rate_for_product_with_charge_taxes_set_to_false(
+    checkout_with_item,
+    address,
+    plugin_configuration,
+    shipping_zone,
+    site_settings,
+    stub_tax_codes,
+):
+    # given
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+    plugin_configuration()
+    unit_price = TaxedMoney(Money(12, "USD"), Money(12, "USD"))
+
+    manager = get_plugins_manager()
+
+    checkout_with_item.shipping_address = address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+
+    checkout_info = CheckoutInfo(
+        checkout=checkout_with_item,
+        shipping_method=checkout_with_item.shipping_method,
+        shipping_address=address,
+        billing_address=None,
+        channel=checkout_with_item.channel,
+        user=None,
+        shipping_method_channel_listings=None,
+        valid_shipping_methods=[],
+    )
+    lines = fetch_checkout_lines(checkout_with_item)
+    checkout_line_info = lines[0]
+    product = checkout_line_info.product
+    product.charge_taxes = False
+    product.save(update_fields=["charge_taxes"])
+
+    # when
+    tax_rate = manager.get_checkout_line_tax_rate(
+        checkout_info,
+        lines,
+        checkout_line_info,
+        checkout_with_item.shipping_address,
+        [],
+        unit_price,
+    )
+
+    # then
+    assert tax_rate == Decimal("0.0")
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_get_checkout_line_tax_rate_for_product_type_with_non_taxable_product(
+    monkeypatch,
+    checkout_with_item,
+    address,
+    plugin_configuration,
+    shipping_zone,
+    site_settings,
+    product_with_two_variants,
+):
+    # given
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+    plugin_configuration()
+    monkeypatch.setattr(
+        "saleor.plugins.avatax.plugin.get_cached_tax_codes_or_fetch",
+        lambda _: {"NT": "Non-Taxable Product"},
+    )
+    unit_price = TaxedMoney(Money(12, "USD"), Money(12, "USD"))
+
+    manager = get_plugins_manager()
+
+    product_type = ProductType.objects.create(name="non-taxable")
+    product2 = product_with_two_variants
+    product2.product_type = product_type
+    manager.assign_tax_code_to_object_meta(product_type, "NT")
+    product2.save(update_fields=["product_type"])
+    product_type.save(update_fields=["metadata"])
+
+    checkout_with_item.shipping_address = address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+
+    variant2 = product2.variants.first()
+    checkout_info = CheckoutInfo(
+        checkout=checkout_with_item,
+        shipping_method=checkout_with_item.shipping_method,
+        shipping_address=address,
+        billing_address=None,
+        channel=checkout_with_item.channel,
+        user=None,
+        shipping_method_channel_listings=None,
+        valid_shipping_methods=[],
+    )
+    add_variant_to_checkout(checkout_info, variant2, 1)
+
+    assert checkout_with_item.lines.count() == 2
+
+    lines = fetch_checkout_lines(checkout_with_item)
+    order = [checkout_with_item.lines.first().variant_id, variant2.pk]
+    lines.sort(key=lambda line: order.index(line.variant.pk))
+
+    # when
+    tax_rates = [
+        manager.get_checkout_line_tax_rate(
+            checkout_info,
+            lines,
+            checkout_line_info,
+            checkout_with_item.shipping_address,
+            [],
+            unit_price,
+        )
+        for checkout_line_info in lines
+    ]
+
+    # then
+    assert tax_rates[0] == Decimal("0.23")
+    assert tax_rates[1] == Decimal("0.0")
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_get_order_line_tax_rate(
+    order_line,
+    shipping_zone,
+    plugin_configuration,
+    site_settings,
+    address,
+    stub_tax_codes,
+):
+    # given
+    order = order_line.order
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+    plugin_configuration()
+
+    unit_price = TaxedMoney(Money(12, "USD"), Money(14, "USD"))
+
+    manager = get_plugins_manager()
+
+    product = Product.objects.get(name=order_line.product_name)
+
+    method = shipping_zone.shipping_methods.get()
+    order.shipping_address = order.billing_address.get_copy()
+    order.shipping_method_name = method.name
+    order.shipping_method = method
+    order.save()
+
+    # when
+    tax_rate = manager.get_order_line_tax_rate(
+        order,
+        product,
+        order_line.variant,
+        None,
+        unit_price,
+    )
+
+    # then
+    assert tax_rate == Decimal("0.23")
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_get_checkout_shipping_tax_rate(
+    checkout_with_item, address, plugin_configuration, shipping_zone, site_settings
+):
+    # given
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+    plugin_configuration()
+    shipping_price = TaxedMoney(Money(12, "USD"), Money(15, "USD"))
+
+    manager = get_plugins_manager()
+
+    checkout_with_item.shipping_address = address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+
+    lines = fetch_checkout_lines(checkout_with_item)
+    checkout_info = CheckoutInfo(
+        checkout=checkout_with_item,
+        shipping_method=checkout_with_item.shipping_method,
+        shipping_address=address,
+        billing_address=None,
+        channel=checkout_with_item.channel,
+        user=None,
+        shipping_method_channel_listings=None,
+        valid_shipping_methods=[],
+    )
+
+    # when
+    tax_rate = manager.get_checkout_shipping_tax_rate(
+        checkout_info,
+        lines,
+        checkout_with_item.shipping_address,
+        [],
+        shipping_price,
+    )
+
+    # then
+    assert tax_rate == Decimal("0.23")
+
+
+@pytest.mark.vcr
+@override_settings(PLUGINS=["saleor.plugins.avatax.plugin.AvataxPlugin"])
+def test_get_order_shipping_tax_rate(
+    order_line, shipping_zone, plugin_configuration, site_settings, address
+):
+    # given
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+    order = order_line.order
+    plugin_configuration()
+    shipping_price = TaxedMoney(Money(12, "USD"), Money(15, "USD"))
+
+    manager = get_plugins_manager()
+
+    method = shipping_zone.shipping_methods.get()
+    order.shipping_address = order.billing_address.get_copy()
+    order.shipping_method_name = method.name
+    order.shipping_method = method
+    order.save()
+
+    # when
+    tax_rate = manager.get_order_shipping_tax_rate(order, shipping_price)
+
+    # then
+    assert tax_rate == Decimal("0.23")
+
+
+@pytest.mark.vcr
+def test_plugin_uses_configuration_from_db(
+    plugin_configuration,
+    ship_to_pl_address,
+    site_settings,
+    address,
+    checkout_with_item,
+    shipping_zone,
+    discount_info,
+    settings,
+    stub_tax_codes,
+):
+    settings.PLUGINS = ["saleor.plugins.avatax.plugin.AvataxPlugin"]
+    configuration = plugin_configuration(
+        username="2000134479", password="697932CFCBDE505B", sandbox=False
+    )
+    manager = get_plugins_manager()
+
+    site_settings.company_address = address
+    site_settings.save(update_fields=["company_address"])
+
+    checkout_with_item.shipping_address = ship_to_pl_address
+    checkout_with_item.shipping_method = shipping_zone.shipping_methods.get()
+    checkout_with_item.save(update_fields=["shipping_address", "shipping_method"])
+    discounts = [discount_info]
+    lines = fetch_checkout_lines(checkout_with_item)
+    checkout_info = fetch_checkout_info(checkout_with_item, lines, discounts, manager)
+    manager.preprocess_order_creation(checkout_info, discounts, lines)
+
+    field_to_update = [
+        {"name": "Username or account", "value": "New value"},
+        {"name": "Password or license", "value": "Wrong pass"},
+    ]
+    AvataxPlugin._update_config_items(field_to_update, configuration.configuration)
+    configuration.save()
+
+    manager = get_plugins_manager()
+    with pytest.raises(TaxError):
+        manager.preprocess_order_creation(checkout_info, discounts, lines)
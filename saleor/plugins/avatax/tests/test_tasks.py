@@ -5,13 +5,14 @@ import pytest
 
 from ....core.taxes import TaxError
 from ....order import OrderEvents
-from .. import AvataxConfiguration, get_api_url, get_order_request_data
+from .. import get_api_url, get_order_request_data
 from ..tasks import api_post_request_task
 
 
+@pytest.mark.slow
 @pytest.mark.vcr
 def test_api_post_request_task_sends_request(
-    order_with_lines, address_usa, shipping_zone, site_settings
+    order_with_lines, address_usa, shipping_zone, site_settings, avatax_config
 ):
     method = shipping_zone.shipping_methods.get()
     order_with_lines.shipping_address = order_with_lines.billing_address.get_copy()
@@ -22,15 +23,7 @@ def test_api_post_request_task_sends_request(
     site_settings.company_address = address_usa
     site_settings.save()
 
-    config = AvataxConfiguration(
-        username_or_account="",
-        password_or_license="",
-        use_sandbox=False,
-        from_street_address="Tęczowa 7",
-        from_city="WROCŁAW",
-        from_postal_code="53-601",
-        from_country="PL",
-    )
+    config = avatax_config("", "", use_sandbox=False)
     request_data = get_order_request_data(order_with_lines, config)
 
     transaction_url = urljoin(
@@ -41,9 +34,10 @@ def test_api_post_request_task_sends_request(
     )
 
 
+@pytest.mark.slow
 @pytest.mark.vcr
 def test_api_post_request_task_creates_order_event(
-    order_with_lines, address_usa, shipping_zone, site_settings
+    order_with_lines, address_usa, shipping_zone, site_settings, avatax_config
 ):
     method = shipping_zone.shipping_methods.get()
     order_with_lines.shipping_address = order_with_lines.billing_address.get_copy()
@@ -54,15 +48,7 @@ def test_api_post_request_task_creates_order_event(
     site_settings.company_address = address_usa
     site_settings.save()
 
-    config = AvataxConfiguration(
-        username_or_account="",
-        password_or_license="",
-        use_sandbox=False,
-        from_street_address="Tęczowa 7",
-        from_city="WROCŁAW",
-        from_postal_code="53-601",
-        from_country="PL",
-    )
+    config = avatax_config("", "", use_sandbox=False)
     request_data = get_order_request_data(order_with_lines, config)
 
     transaction_url = urljoin(
@@ -80,22 +66,14 @@ def test_api_post_request_task_creates_order_event(
 
 
 def test_api_post_request_task_missing_response(
-    order_with_lines, shipping_zone, monkeypatch
+    order_with_lines, shipping_zone, monkeypatch, avatax_config
 ):
     mock_api_post_request = {"error": {"message": "Wrong credentials"}}
     monkeypatch.setattr(
         "saleor.plugins.avatax.tasks.api_post_request", lambda *_: mock_api_post_request
     )
 
-    config = AvataxConfiguration(
-        username_or_account="test",
-        password_or_license="test",
-        use_sandbox=False,
-        from_street_address="Tęczowa 7",
-        from_city="WROCŁAW",
-        from_postal_code="53-601",
-        from_country="PL",
-    )
+    config = avatax_config("test", "test", use_sandbox=False)
     request_data = get_order_request_data(order_with_lines, config)
 
     transaction_url = urljoin(
@@ -114,22 +92,14 @@ def test_api_post_request_task_missing_response(
 
 
 def test_api_post_request_task_order_doesnt_have_any_lines_with_taxes_to_calculate(
-    order_with_lines, shipping_zone, monkeypatch
+    order_with_lines, shipping_zone, monkeypatch, avatax_config
 ):
     mock_api_post_request = {"error": {"message": "Wrong credentials"}}
     monkeypatch.setattr(
         "saleor.plugins.avatax.tasks.api_post_request", lambda *_: mock_api_post_request
     )
 
-    config = AvataxConfiguration(
-        username_or_account="test",
-        password_or_license="test",
-        use_sandbox=False,
-        from_street_address="Tęczowa 7",
-        from_city="WROCŁAW",
-        from_postal_code="53-601",
-        from_country="PL",
-    )
+    config = avatax_config("test", "test", use_sandbox=False)
     request_data = {}
 
     transaction_url = urljoin(